@@ -16,9 +16,10 @@ Dependencies:
 """
 
 import cv2
+import time
 import numpy as np
-from image_processing import remove_backgrounds
-from image_merging import merge_images_overlap
+from image_processing import remove_background
+from image_merging import MergeState
 from config import save_config_to_json, load_config_from_json, CONFIG
 from rich.console import Console
 
@@ -27,9 +28,141 @@ console = Console()
 # 轨迹条初始化的问题，需要使用标志表示已完成才能调用on_trackbar_change函数，不然会报错
 trackbars_created = False
 
+# 预览循环中复用的背景移除输出缓冲区，按图像编号索引
+preview_buffers = {}
+
+# 预览的增量合并状态
+preview_state = None
+
+# 渲染状态：阈值变化需要重新移除背景，图像切换只需要重新显示
+threshold_dirty = False
+display_dirty = False
+dirty_since = None
+last_render_time = 0.0
+
+# 帧间隔及当前空闲等待时间（毫秒），由 adjust_colors_and_preview 按配置初始化
+frame_interval_ms = 33
+idle_wait_ms = 33
+
+
+def get_positive_config(key, default):
+    """
+    读取配置中的正数，值无效时打印警告并使用默认值。
+
+    Args:
+        key (str): 配置项名称。
+        default (int): 默认值。
+
+    Returns:
+        int or float: 配置值。
+    """
+    value = CONFIG.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        console.print(f"[yellow]{key} 无效: {value}，使用默认值 {default}[/yellow]")
+        value = default
+    return value
+
+
+def get_frame_interval_ms():
+    """
+    根据配置中的帧率上限计算帧间隔。
+
+    Returns:
+        int: 帧间隔（毫秒），至少为 1。
+    """
+    return max(1, int(1000 / get_positive_config('PREVIEW_FPS', 30)))
+
+
+def mark_dirty(threshold=False):
+    """
+    标记预览需要重新渲染，记录最早一次变化的时间用于计算渲染延迟，
+    并将空闲等待恢复到帧间隔，使后续的变化能在一帧内显示。
+
+    Args:
+        threshold (bool, optional): 颜色阈值是否变化。
+    """
+    global threshold_dirty, display_dirty, dirty_since, idle_wait_ms
+
+    if threshold:
+        threshold_dirty = True
+    display_dirty = True
+    if dirty_since is None:
+        dirty_since = time.perf_counter()
+    idle_wait_ms = frame_interval_ms
+
+
+def refresh_foregrounds(image_paths):
+    """
+    按当前颜色阈值重新计算所有参与合并图像的前景。
+
+    Args:
+        image_paths (list of str): 要处理的图像路径列表。
+    """
+    global preview_state
+
+    # 首次调用时所有图像都参与合并
+    if preview_state is None:
+        preview_state = MergeState(CONFIG.get('MERGE_METHOD', 'weighted'))
+        active = range(len(image_paths))
+    else:
+        active = preview_state.keys()
+
+    # 阈值变化会影响所有前景，先清空状态再复用缓冲区重新计算
+    preview_state.clear()
+    for i in active:
+        preview_buffers[i] = remove_background(image_paths[i], np.array(lower_bound), np.array(upper_bound),
+                                               out=preview_buffers.get(i))
+        preview_state.insert(i, preview_buffers[i])
+
+
+def render_preview(image_paths):
+    """
+    渲染预览图像，并在窗口标题中显示帧耗时和渲染延迟。
+
+    Args:
+        image_paths (list of str): 要处理的图像路径列表。
+    """
+    global threshold_dirty, display_dirty, dirty_since, last_render_time
+
+    start_time = time.perf_counter()
+    if threshold_dirty:
+        refresh_foregrounds(image_paths)
+    cv2.imshow('Adjusted Merged Image', preview_state.result())
+    end_time = time.perf_counter()
+
+    frame_ms = (end_time - start_time) * 1000
+    latency_ms = (end_time - dirty_since) * 1000
+    cv2.setWindowTitle('Adjusted Merged Image',
+                       f"Adjusted Merged Image | frame {frame_ms:.1f} ms | latency {latency_ms:.1f} ms")
+
+    threshold_dirty = False
+    display_dirty = False
+    dirty_since = None
+    last_render_time = end_time
+
+
+def render_if_due(image_paths):
+    """
+    预览需要更新且距离上一帧已超过帧间隔时进行渲染。
+
+    Args:
+        image_paths (list of str): 要处理的图像路径列表。
+
+    Returns:
+        bool: 是否进行了渲染。
+    """
+    if not display_dirty:
+        return False
+    if (time.perf_counter() - last_render_time) * 1000 < frame_interval_ms:
+        return False
+    render_preview(image_paths)
+    return True
+
+
 def on_trackbar_change(image_paths, _):
     """
-    响应轨迹条值变化，更新图像的颜色阈值，并展示处理后的图像。
+    响应轨迹条值变化，更新图像的颜色阈值，并在帧率上限内展示处理后的图像。
+    拖动过快时只标记需要渲染，剩余的变化由主循环在下一帧补上。
 
     Args:
         image_paths (list of str): 要处理的图像路径列表。
@@ -39,34 +172,62 @@ def on_trackbar_change(image_paths, _):
 
     if not trackbars_created:
         return
-    
-    config = CONFIG.get('MERGE_METHOD', 'weighted')
 
     # 获取轨迹条当前位置作为颜色边界值
     lower_bound = [cv2.getTrackbarPos('LowerBound' + ch, 'Adjust Colors') for ch in ['B', 'G', 'R']]
     upper_bound = [cv2.getTrackbarPos('UpperBound' + ch, 'Adjust Colors') for ch in ['B', 'G', 'R']]
 
-    # 用于展示处理结果的临时变量
-    temp_foregrounds = remove_backgrounds(image_paths, np.array(lower_bound), np.array(upper_bound))
-    temp_merged_image = merge_images_overlap(temp_foregrounds, method=config)
-    
-    # 显示处理后的图像
-    cv2.imshow('Adjusted Merged Image', temp_merged_image)
+    mark_dirty(threshold=True)
+    render_if_due(image_paths)
+
+
+def toggle_image(image_paths, index):
+    """
+    切换单张图像是否参与合并，只更新这一张图像的贡献。
+
+    Args:
+        image_paths (list of str): 要处理的图像路径列表。
+        index (int): 要切换的图像编号。
+    """
+    if index >= len(image_paths):
+        return
+
+    if index in preview_state:
+        # 至少保留一张图像用于预览
+        if len(preview_state) == 1:
+            console.print("[yellow]至少需要保留一张图像[/yellow]")
+            return
+        preview_state.remove(index)
+        console.print(f"图像 {index + 1} [red]已移除[/red]: {image_paths[index]}")
+    else:
+        preview_buffers[index] = remove_background(image_paths[index], np.array(lower_bound), np.array(upper_bound),
+                                                   out=preview_buffers.get(index))
+        preview_state.insert(index, preview_buffers[index])
+        console.print(f"图像 {index + 1} [green]已加入[/green]: {image_paths[index]}")
+
+    mark_dirty()
+
 
 def adjust_colors_and_preview(image_paths):
     """
     创建一个窗口和轨迹条，允许用户实时调整颜色阈值，并展示处理后的图像效果。
+    主循环只在预览需要更新时按帧率上限渲染，空闲时逐步延长等待按键的时间。
 
     Args:
         image_paths (list of str): 要处理的图像路径列表。
     """
-    global lower_bound, upper_bound, trackbars_created
+    global lower_bound, upper_bound, trackbars_created, frame_interval_ms, idle_wait_ms
 
     # 加载配置
     config = load_config_from_json()
     lower_bound = config.get("LOWER_BOUND_COLOR", [0, 0, 0])
     upper_bound = config.get("UPPER_BOUND_COLOR", [255, 255, 255])
 
+    # 帧间隔及空闲时的最长等待时间（毫秒）
+    frame_interval_ms = get_frame_interval_ms()
+    idle_wait_ms = frame_interval_ms
+    max_idle_wait_ms = max(frame_interval_ms, int(get_positive_config('PREVIEW_IDLE_WAIT_MS', 200)))
+
     # 创建窗口和轨迹条
     cv2.namedWindow('Adjust Colors')
     for i, ch in enumerate(['B', 'G', 'R']):
@@ -81,6 +242,7 @@ def adjust_colors_and_preview(image_paths):
 
     instructions = [
         ("[bold green]'s' 键[/bold green]", "保存设置"),
+        ("[bold cyan]'1'-'9' 键[/bold cyan]", "切换对应图像是否参与合并"),
         ("[bold red]'ESC' 键[/bold red]", "退出程序"),
     ]
 
@@ -89,8 +251,18 @@ def adjust_colors_and_preview(image_paths):
         console.print(f"{key} : [bold]{action}[/bold]")
 
     while True:
-        # 按键检测
-        key = cv2.waitKey(1) & 0xFF
+        # 有待渲染的变化时等到下一帧，否则按空闲等待时间等待按键
+        if display_dirty:
+            elapsed_ms = (time.perf_counter() - last_render_time) * 1000
+            wait_ms = max(1, int(frame_interval_ms - elapsed_ms))
+        else:
+            wait_ms = idle_wait_ms
+
+        # 按键检测，等待期间轨迹条的回调会被调用
+        wait_start = time.perf_counter()
+        key = cv2.waitKey(wait_ms) & 0xFF
+        # 等待期间回调中发生过渲染说明轨迹条正在使用，不能视为空闲
+        rendered_during_wait = last_render_time > wait_start
 
         # 检查窗口是否关闭
         if cv2.getWindowProperty('Adjust Colors', cv2.WND_PROP_VISIBLE) < 1:  
@@ -99,8 +271,13 @@ def adjust_colors_and_preview(image_paths):
         if key == ord('s'):  # 按 's' 键保存设置
             save_config_to_json(lower_bound, upper_bound)
             print("Settings saved.")
+        elif ord('1') <= key <= ord('9'):  # 按数字键切换对应图像
+            toggle_image(image_paths, key - ord('1'))
         elif key == 27:  # 按 'ESC' 键退出
             break
 
-
-
+        # 有按键或渲染时恢复到帧间隔，空闲时逐步加倍等待时间
+        if render_if_due(image_paths) or key != 0xFF or rendered_during_wait:
+            idle_wait_ms = frame_interval_ms
+        elif not display_dirty:
+            idle_wait_ms = min(idle_wait_ms * 2, max_idle_wait_ms)
@@ -0,0 +1,395 @@
+# batch_runner.py
+
+"""
+批量任务模块
+-----------------------
+
+Author: keeleycenc
+Created on: 2026-10-18
+Last Modified: 2026-10-18
+
+Description:
+    读取 JSONL 格式的任务清单并批量执行图像合并任务。
+    清单中每一行是一个任务，例如：
+        {"id": "job-1", "images": ["images/a.jpg", "images/b.jpg"], "method": "weighted",
+         "lower_bound": [0, 0, 0], "upper_bound": [255, 75, 255], "output": "combined_image/job-1.jpg"}
+    除 images 外的字段均可省略，省略时使用配置文件中的值。
+
+    多个任务共用的输入图像只解码一次。任务按共用图像的多少重新排序，
+    缓存满时淘汰下一次使用最远的图像，使每张解码后的图像及其掩码结果
+    在被淘汰前尽量服务所有引用它的任务，之后不再使用的图像和掩码结果在任务结束后立即释放。
+    output 以 .dzi 结尾的任务保存为 DeepZoom 分块金字塔，网格拼接保留原始分辨率。
+    每个任务的状态和耗时追加写入结果 JSONL 文件，中断后重新运行会跳过已成功的任务。
+
+Usage:
+    python scr/batch_runner.py jobs.jsonl [results.jsonl]
+
+Dependencies:
+    - OpenCV
+    - NumPy
+    - Rich
+"""
+
+import argparse
+import bisect
+import json
+import os
+import time
+import cv2
+import numpy as np
+from image_processing import remove_background_fused
+from pixel_store import read_image, read_image_hsv
+from image_merging import merge_images_overlap
+from file_utils import save_image_pyramid
+from config import CONFIG
+from rich.console import Console
+
+# 创建一个 Console 实例用于打印
+console = Console()
+
+
+def normalize_path(path):
+    """
+    规范化图像路径，用于识别不同任务中的相同输入。
+
+    Args:
+        path (str): 图像路径。
+
+    Returns:
+        str: 规范化后的绝对路径。
+    """
+    return os.path.normcase(os.path.abspath(path))
+
+
+def is_color_bound(value):
+    """
+    检查颜色边界是否为三个整数。
+
+    Args:
+        value: 待检查的值。
+
+    Returns:
+        bool: 是否为有效的颜色边界。
+    """
+    return (isinstance(value, list) and len(value) == 3
+            and all(isinstance(v, int) and not isinstance(v, bool) for v in value))
+
+
+def load_manifest(manifest_path):
+    """
+    读取任务清单，并为缺省字段填充配置文件中的值。
+
+    Args:
+        manifest_path (str): JSONL 任务清单的路径。
+
+    Returns:
+        list of dict: 任务列表。
+
+    Raises:
+        ValueError: 任务格式错误或任务 ID 重复
+    """
+    combined_image = CONFIG.get('COMBINED_IMAGE', 'combined_image')
+    jobs = []
+    seen_ids = set()
+
+    with open(manifest_path, 'r') as file:
+        for line_no, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                raise ValueError(f"任务清单第 {line_no} 行格式错误")
+            if not isinstance(entry, dict):
+                raise ValueError(f"任务清单第 {line_no} 行格式错误")
+
+            images = entry.get('images')
+            if not images:
+                raise ValueError(f"任务清单第 {line_no} 行缺少 images")
+            if not isinstance(images, list) or not all(isinstance(path, str) for path in images):
+                raise ValueError(f"任务清单第 {line_no} 行的 images 必须是路径字符串列表")
+
+            bounds = {}
+            for field, config_key, default in (('lower_bound', 'LOWER_BOUND_COLOR', [0, 0, 0]),
+                                               ('upper_bound', 'UPPER_BOUND_COLOR', [255, 75, 255])):
+                value = entry.get(field, CONFIG.get(config_key, default))
+                if not is_color_bound(value):
+                    raise ValueError(f"任务清单第 {line_no} 行的 {field} 必须是三个整数")
+                bounds[field] = tuple(value)
+
+            job_id = str(entry.get('id', f"job-{line_no}"))
+            if job_id in seen_ids:
+                raise ValueError(f"任务 ID 重复: {job_id}")
+            seen_ids.add(job_id)
+
+            jobs.append({
+                'id': job_id,
+                'images': [normalize_path(path) for path in images],
+                'method': entry.get('method', CONFIG.get('MERGE_METHOD', 'weighted')),
+                'lower_bound': bounds['lower_bound'],
+                'upper_bound': bounds['upper_bound'],
+                'output': entry.get('output', os.path.join(combined_image, f"{job_id}.jpg")),
+            })
+
+    return jobs
+
+
+def load_completed_ids(results_path):
+    """
+    读取结果文件中已成功完成的任务 ID。
+
+    Args:
+        results_path (str): JSONL 结果文件的路径。
+
+    Returns:
+        set of str: 已成功完成的任务 ID。
+    """
+    completed = set()
+    try:
+        with open(results_path, 'r') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 中断时可能留下不完整的最后一行
+                    continue
+                if record.get('status') == 'ok':
+                    completed.add(record.get('id'))
+    except FileNotFoundError:
+        pass
+    return completed
+
+
+def schedule_jobs(jobs):
+    """
+    重新排列任务顺序，使共用输入图像的任务相邻执行。
+    从清单中第一个任务开始，每次选择与上一个任务共用图像最多的任务，
+    共用数量相同时保持清单中的顺序。
+
+    Args:
+        jobs (list of dict): 任务列表。
+
+    Returns:
+        list of dict: 排序后的任务列表。
+    """
+    remaining = list(jobs)
+    ordered = []
+    previous = set()
+
+    while remaining:
+        best_index = 0
+        best_shared = -1
+        for i, job in enumerate(remaining):
+            shared = len(previous.intersection(job['images']))
+            if shared > best_shared:
+                best_index, best_shared = i, shared
+        job = remaining.pop(best_index)
+        ordered.append(job)
+        previous = set(job['images'])
+
+    return ordered
+
+
+class ImageCache:
+    """
+    解码图像及其背景移除结果的缓存。
+    缓存满时淘汰下一次使用最远（或之后不再使用）的图像，当前任务仍需要的图像不会被淘汰。
+    每个任务结束后释放之后不再使用的图像和背景移除结果。
+    """
+
+    def __init__(self, jobs, capacity):
+        """
+        Args:
+            jobs (list of dict): 按执行顺序排列的任务列表，用于预先计算每张图像及每个背景移除结果的使用时刻。
+            capacity (int): 最多缓存的解码图像数量。当前任务需要的图像多于上限时会暂时超出。
+        """
+        self.capacity = max(1, capacity)
+        self._entries = {}
+        self._image_uses = {}
+        self._foreground_uses = {}
+        for step, job in enumerate(jobs):
+            bounds = (job['lower_bound'], job['upper_bound'])
+            for path in dict.fromkeys(job['images']):
+                self._image_uses.setdefault(path, []).append(step)
+                self._foreground_uses.setdefault((path, bounds), []).append(step)
+
+    @staticmethod
+    def _next_use(uses, step, later=False):
+        """
+        Args:
+            uses (list of int): 已排序的使用时刻。
+            step (int): 当前任务在执行顺序中的位置。
+            later (bool, optional): 为 True 时只考虑 step 之后的使用，否则包含当前任务。
+
+        Returns:
+            float: 下一次使用时刻，不再使用时为无穷大。
+        """
+        bisect_fn = bisect.bisect_right if later else bisect.bisect_left
+        i = bisect_fn(uses, step)
+        return uses[i] if i < len(uses) else float('inf')
+
+    def _load(self, path, step):
+        """
+        解码图像并放入缓存。只有之后还会使用的图像才会在缓存满时淘汰其它图像，
+        解码失败时不淘汰任何图像。
+        """
+        image = read_image(path)
+        if image is None:
+            raise ValueError(f"无法加载图像: {path}")
+
+        if self._next_use(self._image_uses.get(path, []), step, later=True) != float('inf'):
+            while len(self._entries) >= self.capacity:
+                victim = max(self._entries, key=lambda cached: self._next_use(self._image_uses[cached], step))
+                # 当前任务仍需要的图像不淘汰，暂时超出上限
+                if self._next_use(self._image_uses[victim], step) == step:
+                    break
+                del self._entries[victim]
+
+        entry = {'image': image, 'hsv': read_image_hsv(path), 'foregrounds': {}}
+        # 当前任务内先保留，任务结束时由 release 释放不再使用的图像
+        self._entries[path] = entry
+        return entry
+
+    def get_foreground(self, path, lower_bound, upper_bound, step):
+        """
+        获取图像在指定颜色阈值下移除背景后的结果。
+
+        Args:
+            path (str): 规范化后的图像路径。
+            lower_bound (tuple): 要移除的颜色范围的下界（HSV格式）。
+            upper_bound (tuple): 要移除的颜色范围的上界（HSV格式）。
+            step (int): 当前任务在执行顺序中的位置。
+
+        Returns:
+            numpy.ndarray: 移除背景后的图像，调用方不能原地修改。
+        """
+        entry = self._entries.get(path)
+        if entry is None:
+            entry = self._load(path, step)
+
+        key = (lower_bound, upper_bound)
+        foreground = entry['foregrounds'].get(key)
+        if foreground is None:
+            foreground = remove_background_fused(entry['image'], np.array(lower_bound), np.array(upper_bound),
+                                                 hsv=entry['hsv'])
+            entry['foregrounds'][key] = foreground
+        return foreground
+
+    def release(self, step):
+        """
+        任务结束后释放之后不再使用的图像和背景移除结果，并将缓存恢复到上限以内。
+
+        Args:
+            step (int): 刚结束的任务在执行顺序中的位置。
+        """
+        for path in list(self._entries):
+            if self._next_use(self._image_uses.get(path, []), step, later=True) == float('inf'):
+                del self._entries[path]
+                continue
+            foregrounds = self._entries[path]['foregrounds']
+            for key in list(foregrounds):
+                uses = self._foreground_uses.get((path, key), [])
+                if self._next_use(uses, step, later=True) == float('inf'):
+                    del foregrounds[key]
+
+        # 当前任务暂时超出的部分按下一次使用最远的顺序淘汰
+        while len(self._entries) > self.capacity:
+            victim = max(self._entries, key=lambda cached: self._next_use(self._image_uses[cached], step, later=True))
+            del self._entries[victim]
+
+
+def run_job(job, cache, step):
+    """
+    执行单个合并任务并保存结果。
+
+    Args:
+        job (dict): 任务。
+        cache (ImageCache): 图像缓存。
+        step (int): 当前任务在执行顺序中的位置。
+
+    Returns:
+        str: 保存的文件路径。
+    """
+    foregrounds = [cache.get_foreground(path, job['lower_bound'], job['upper_bound'], step)
+                   for path in job['images']]
+
+    output_dir, output_name = os.path.split(job['output'])
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    if output_name.lower().endswith('.dzi'):
+        merged_image = merge_images_overlap(foregrounds, method=job['method'], grid_output_size=None)
+        return save_image_pyramid(merged_image, output_dir or '.', name=os.path.splitext(output_name)[0])
+
+    merged_image = merge_images_overlap(foregrounds, method=job['method'])
+    if not cv2.imwrite(job['output'], merged_image):
+        raise ValueError(f"无法保存图像: {job['output']}")
+    return job['output']
+
+
+def run_manifest(manifest_path, results_path, cache_size=None):
+    """
+    执行任务清单中所有未完成的任务，并将每个任务的状态和耗时追加到结果文件。
+
+    Args:
+        manifest_path (str): JSONL 任务清单的路径。
+        results_path (str): JSONL 结果文件的路径。
+        cache_size (int, optional): 最多缓存的解码图像数量。默认使用配置文件中的 BATCH_CACHE_SIZE。
+
+    Returns:
+        dict: 各状态的任务数量。
+    """
+    if cache_size is None:
+        cache_size = CONFIG.get('BATCH_CACHE_SIZE', 16)
+
+    jobs = load_manifest(manifest_path)
+    completed = load_completed_ids(results_path)
+    pending = schedule_jobs([job for job in jobs if job['id'] not in completed])
+    console.print(f"[bold]Jobs:[/bold] {len(jobs)} total, {len(jobs) - len(pending)} already done, "
+                  f"{len(pending)} pending")
+
+    cache = ImageCache(pending, cache_size)
+    summary = {'ok': 0, 'error': 0, 'skipped': len(jobs) - len(pending)}
+
+    with open(results_path, 'a') as results:
+        for step, job in enumerate(pending):
+            start_time = time.perf_counter()
+            record = {'id': job['id']}
+            try:
+                record['output'] = run_job(job, cache, step)
+                record['status'] = 'ok'
+            except Exception as e:
+                record['status'] = 'error'
+                record['error'] = str(e)
+            cache.release(step)
+            record['seconds'] = round(time.perf_counter() - start_time, 4)
+            summary[record['status']] += 1
+
+            # 每个任务完成后立即落盘，中断后可以从这里继续
+            results.write(json.dumps(record, ensure_ascii=False) + '\n')
+            results.flush()
+            os.fsync(results.fileno())
+
+            style = 'green' if record['status'] == 'ok' else 'red'
+            console.print(f"[{style}]{record['status']}[/{style}] {job['id']} ({record['seconds']:.2f}s)")
+
+    console.print(f"[bold]Done:[/bold] {summary}")
+    return summary
+
+
+def main():
+    """
+    批量任务入口
+    """
+    parser = argparse.ArgumentParser(description="批量执行图像合并任务")
+    parser.add_argument('manifest', help="JSONL 任务清单的路径")
+    parser.add_argument('results', nargs='?', default='results.jsonl', help="JSONL 结果文件的路径")
+    parser.add_argument('--cache-size', type=int, default=None, help="最多缓存的解码图像数量")
+    args = parser.parse_args()
+
+    run_manifest(args.manifest, args.results, args.cache_size)
+
+
+if __name__ == "__main__":
+    main()
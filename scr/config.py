@@ -16,6 +16,13 @@ Description:
     MERGE_METHOD: 不同的图片合并方法，"weighted" 或者 "simple" 可选
     LOWER_BOUND_COLOR: 要移除的颜色范围的下界（HSV格式）
     UPPER_BOUND_COLOR: 要移除的颜色范围的上界（HSV格式）
+    OUTPUT_FORMAT: 输出格式，"jpg" 或者 "dzi"（DeepZoom 分块金字塔）可选
+    BATCH_CACHE_SIZE: 批量任务最多缓存的解码图像数量
+    PIXEL_STORE: 解码像素存储目录，设置后将解码结果保存为 .npy 并在之后的运行中直接映射
+    PIXEL_STORE_MAX_MB: 解码像素存储的总大小上限（MB）
+    PIXEL_STORE_HSV: 是否同时保存 HSV 转换结果
+    PREVIEW_FPS: 预览窗口的帧率上限
+    PREVIEW_IDLE_WAIT_MS: 预览窗口空闲时等待按键的最长时间（毫秒）
 
 Dependencies:
     none
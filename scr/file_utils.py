@@ -9,7 +9,8 @@ Created on: 2023-12-30
 Last Modified: 2023-12-30
 
 Description:
-    此模块提供文件处理相关功能，包括获取图像文件路径和使用图形界面选择图像文件。
+    此模块提供文件处理相关功能，包括获取图像文件路径和使用图形界面选择图像文件，
+    以及保存单张图像或 DeepZoom 分块金字塔。
     它支持多种图像格式，并允许用户指定最大图像数量限制。
 
 Dependencies:
@@ -17,7 +18,9 @@ Dependencies:
 """
 
 import cv2
+import math
 import os
+import shutil
 import tkinter as tk
 import sys
 from datetime import datetime
@@ -130,3 +133,69 @@ def save_image(image, folder_path):
     cv2.imwrite(file_path, image)
     console.print("Saved image path:", "[blue]" + file_path + "[/blue]")
     return file_path
+
+
+def save_image_pyramid(image, folder_path, name=None, tile_size=256, overlap=0, tile_format='jpg'):
+    """
+    将图像保存为 DeepZoom 格式的分块金字塔：一个 .dzi 描述文件和
+    一个按缩放级别存放 tile_size 大小图块的目录。金字塔从原始分辨率开始逐级生成，
+    每一级都由上一级缩小一半得到，浏览器只需加载可见区域的图块。
+
+    Args:
+        image (numpy.ndarray): 要保存的图像。
+        folder_path (str): 图像要保存的文件夹路径。
+        name (str, optional): 文件名（不含扩展名），默认以当前时间命名。
+        tile_size (int, optional): 图块边长（像素）。
+        overlap (int, optional): 相邻图块之间重叠的像素数。
+        tile_format (str, optional): 图块的图像格式，"jpg" 或 "png"。
+
+    Returns:
+        str: 保存的 .dzi 文件路径。
+
+    Raises:
+        ValueError: 图块写入失败
+    """
+    if name is None:
+        name = datetime.now().strftime("%Y%m%d_%H%M%S")
+    dzi_path = f"{folder_path}/{name}.dzi"
+    tiles_path = f"{folder_path}/{name}_files"
+
+    # 清除同名金字塔留下的旧图块和级别
+    if os.path.isdir(tiles_path):
+        shutil.rmtree(tiles_path)
+
+    height, width = image.shape[:2]
+    max_level = math.ceil(math.log2(max(width, height))) if max(width, height) > 1 else 0
+
+    # 从最高级别（原始分辨率）开始，逐级缩小一半
+    level_image = image
+    for level in range(max_level, -1, -1):
+        level_height, level_width = level_image.shape[:2]
+        level_path = f"{tiles_path}/{level}"
+        os.makedirs(level_path, exist_ok=True)
+
+        for row in range(math.ceil(level_height / tile_size)):
+            for col in range(math.ceil(level_width / tile_size)):
+                # 图块的范围，除边缘外向两侧各扩展 overlap 个像素
+                x0 = max(col * tile_size - overlap, 0)
+                y0 = max(row * tile_size - overlap, 0)
+                x1 = min((col + 1) * tile_size + overlap, level_width)
+                y1 = min((row + 1) * tile_size + overlap, level_height)
+                tile_path = f"{level_path}/{col}_{row}.{tile_format}"
+                if not cv2.imwrite(tile_path, level_image[y0:y1, x0:x1]):
+                    raise ValueError(f"无法保存图块: {tile_path}")
+
+        if level > 0:
+            next_size = (math.ceil(level_width / 2), math.ceil(level_height / 2))
+            level_image = cv2.resize(level_image, next_size, interpolation=cv2.INTER_AREA)
+
+    # 写入 DeepZoom 描述文件
+    with open(dzi_path, 'w') as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                   '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" '
+                   f'Format="{tile_format}" Overlap="{overlap}" TileSize="{tile_size}">\n'
+                   f'    <Size Width="{width}" Height="{height}"/>\n'
+                   '</Image>\n')
+
+    console.print("Saved image pyramid path:", "[blue]" + dzi_path + "[/blue]")
+    return dzi_path
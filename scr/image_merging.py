@@ -30,6 +30,8 @@ console = Console()
 def merge_images_weighted(images):
     """
     将多张图片通过加权重叠合并成一张图片。
+    先在整数累加器中求和再取平均（四舍五入），避免逐张叠加时的舍入和截断误差，
+    与 MergeState 的结果完全一致。
 
     Args:
         images (list of numpy.ndarray): 包含图像数组的列表。
@@ -40,18 +42,28 @@ def merge_images_weighted(images):
     images = resize_image_to_same_size(images)
     images = ensure_color_images(images)
 
-    # 初始化合并图像为全黑图像
+    # 初始化累加器
     height, width, channels = images[0].shape
-    merged_image = np.zeros((height, width, channels), dtype=np.uint8)
-
-    # 计算每张图像的权重
-    alpha = 1.0 / len(images)
+    total = np.zeros((height, width, channels), dtype=np.int32)
 
     for img in images:
-        # 将每张图片加权后叠加到合并图像上
-        merged_image = cv2.addWeighted(merged_image, 1.0, img, alpha, 0)
+        np.add(total, img, out=total)
 
-    return merged_image
+    return weighted_average(total, len(images))
+
+
+def weighted_average(total, count):
+    """
+    将累加和按图像数量取平均，每张图像的权重相等。
+
+    Args:
+        total (numpy.ndarray): int32 类型的累加和。
+        count (int): 图像数量。
+
+    Returns:
+        numpy.ndarray: 四舍五入后的 uint8 图像。
+    """
+    return ((total + count // 2) // count).astype(np.uint8)
 
 
 def merge_images_simple(images):
@@ -88,6 +100,7 @@ def merge_images_grid(images, placeholder_image_path, output_size=(1024, 1024)):
         images (list of numpy.ndarray): 需要拼接的图像列表。
         placeholder_image_path (str): 占位图像的路径。
         output_size (tuple, optional): 拼接后的图像大小，格式为(width, height)。
+                                       为 None 时保留原始分辨率。
 
     Returns:
         numpy.ndarray: 拼接后的图像。
@@ -133,12 +146,13 @@ def merge_images_grid(images, placeholder_image_path, output_size=(1024, 1024)):
             grid[row * height:(row + 1) * height, col * width:(col + 1) * width] = placeholder_image
 
     # 调整图像大小以匹配输出尺寸
-    grid = cv2.resize(grid, output_size, interpolation=cv2.INTER_AREA)
+    if output_size is not None:
+        grid = cv2.resize(grid, output_size, interpolation=cv2.INTER_AREA)
 
     return grid
 
 
-def merge_images_overlap(images, method='weighted'):
+def merge_images_overlap(images, method='weighted', grid_output_size=(1024, 1024)):
     """
     根据指定的方法合并图像。
     weighted: 为每张图像分配相等的权重
@@ -148,6 +162,7 @@ def merge_images_overlap(images, method='weighted'):
     Args:
         images (list of numpy.ndarray): 需要合并的图像列表。
         method (str, optional): 图像合并或拼接的方法。
+        grid_output_size (tuple, optional): 网格拼接后的图像大小，为 None 时保留原始分辨率。
 
     Returns:
         numpy.ndarray: 根据指定方法合并后的图像。
@@ -163,15 +178,172 @@ def merge_images_overlap(images, method='weighted'):
     elif method == 'simple':
         return merge_images_simple(images)
     elif method == 'grid' :
-        return merge_images_grid(images, placeholder_image_path, output_size=(1024, 1024))
+        return merge_images_grid(images, placeholder_image_path, output_size=grid_output_size)
     else:
         raise ValueError("Unknown merge method: {}".format(method))
 
 
+class MergeState:
+    """
+    增量合并状态。保存每张图像的前景以及求和/计数累加器，
+    插入、移除或替换单张图像时只需更新这一张图像的贡献，而不必重新合并全部图像。
 
+    weighted: 结果为累加和除以图像数量（四舍五入），与 merge_images_weighted 完全一致
+    simple  : 结果为累加和截断到 255，与 merge_images_simple 完全一致
+    grid    : 网格拼接无法增量更新，获取结果时对当前所有前景重新拼接
 
+    注意：状态保存的是图像的引用，图像在状态中时调用方不能原地修改它。
+    """
 
-
-
-    
-
+    def __init__(self, method='weighted'):
+        """
+        Args:
+            method (str, optional): 图像合并或拼接的方法。
+
+        Raises:
+            ValueError: 方法未找到或不存在
+        """
+        if method not in ('weighted', 'simple', 'grid'):
+            raise ValueError("Unknown merge method: {}".format(method))
+        self.method = method
+        self._foregrounds = {}
+        self._contributions = {}
+        self._sum = None
+        self._size = None
+
+    def __len__(self):
+        return len(self._foregrounds)
+
+    def __contains__(self, key):
+        return key in self._foregrounds
+
+    def keys(self):
+        """
+        Returns:
+            list: 当前参与合并的图像编号（已排序）。
+        """
+        return sorted(self._foregrounds)
+
+    def insert(self, key, image):
+        """
+        向合并状态中加入一张图像。若编号已存在，则替换该图像。
+
+        Args:
+            key (int): 图像编号。
+            image (numpy.ndarray): 移除背景后的图像。
+        """
+        if key in self._foregrounds:
+            self.replace(key, image)
+            return
+
+        self._foregrounds[key] = image
+        if self._min_size() != self._size:
+            self._rebuild()
+            return
+        self._add(key)
+
+    def remove(self, key):
+        """
+        从合并状态中移除一张图像。
+
+        Args:
+            key (int): 图像编号。
+
+        Raises:
+            KeyError: 图像编号不存在
+        """
+        del self._foregrounds[key]
+        contribution = self._contributions.pop(key)
+
+        if not self._foregrounds:
+            self.clear()
+        elif self._min_size() != self._size:
+            self._rebuild()
+        else:
+            np.subtract(self._sum, contribution, out=self._sum)
+
+    def replace(self, key, image):
+        """
+        替换合并状态中的一张图像。
+
+        Args:
+            key (int): 图像编号。
+            image (numpy.ndarray): 新的移除背景后的图像。
+
+        Raises:
+            KeyError: 图像编号不存在
+        """
+        contribution = self._contributions.pop(key)
+        self._foregrounds[key] = image
+
+        if self._min_size() != self._size:
+            self._rebuild()
+            return
+        np.subtract(self._sum, contribution, out=self._sum)
+        self._add(key)
+
+    def clear(self):
+        """
+        清空合并状态。
+        """
+        self._foregrounds.clear()
+        self._contributions.clear()
+        self._sum = None
+        self._size = None
+
+    def result(self):
+        """
+        根据当前累加器生成合并后的图像。
+
+        Returns:
+            numpy.ndarray: 合并后的图像。
+
+        Raises:
+            ValueError: 合并状态中没有图像
+        """
+        if not self._foregrounds:
+            raise ValueError("合并状态中没有图像")
+
+        if self.method == 'grid':
+            placeholder_image_path = CONFIG.get('PLACEHOLDER', 'images/missing.jpg')
+            images = [self._foregrounds[key] for key in self.keys()]
+            return merge_images_grid(images, placeholder_image_path, output_size=(1024, 1024))
+
+        count = len(self._foregrounds)
+        if self.method == 'weighted':
+            return weighted_average(self._sum, count)
+        return np.minimum(self._sum, 255).astype(np.uint8)
+
+    def _min_size(self):
+        """
+        Returns:
+            tuple: 当前所有前景的最小尺寸 (width, height)，没有前景时为 None。
+        """
+        if not self._foregrounds:
+            return None
+        min_height = min(image.shape[0] for image in self._foregrounds.values())
+        min_width = min(image.shape[1] for image in self._foregrounds.values())
+        return (min_width, min_height)
+
+    def _add(self, key):
+        """
+        将一张图像的贡献累加到求和累加器上。
+        """
+        image = self._foregrounds[key]
+        # 与 merge_images_overlap 相同：先统一尺寸，再确保为彩色图像
+        if (image.shape[1], image.shape[0]) != self._size:
+            image = cv2.resize(image, self._size)
+        image = ensure_color_images([image])[0]
+        self._contributions[key] = image
+        np.add(self._sum, image, out=self._sum)
+
+    def _rebuild(self):
+        """
+        最小尺寸变化后，按新的尺寸重新计算所有图像的贡献。
+        """
+        self._contributions.clear()
+        self._size = self._min_size()
+        width, height = self._size
+        self._sum = np.zeros((height, width, 3), dtype=np.int32)
+        for key in self._foregrounds:
+            self._add(key)
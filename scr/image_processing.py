@@ -14,12 +14,72 @@ Description:
 
 Dependencies:
     - OpenCV
+    - NumPy
 """
 
 import cv2
+import numpy as np
+from pixel_store import read_image, read_image_hsv
 
+# 融合背景移除时每个条带的行数，条带缓冲区足够小可以留在缓存中
+STRIP_ROWS = 64
 
-def remove_background(image_path, lower_bound_color, upper_bound_color):
+
+def remove_background_fused(image, lower_bound_color, upper_bound_color, out=None, strip_rows=STRIP_ROWS, hsv=None):
+    """
+    单遍融合的背景移除。按行条带依次完成颜色转换、范围检测和掩码应用，
+    不生成整幅的 HSV 图像、掩码和反转掩码，结果与逐步处理完全一致。
+
+    Args:
+        image (numpy.ndarray): BGR 格式的输入图像。
+        lower_bound_color (numpy.ndarray): 要移除的颜色范围的下界（HSV格式）。
+        upper_bound_color (numpy.ndarray): 要移除的颜色范围的上界（HSV格式）。
+        out (numpy.ndarray, optional): 输出缓冲区，形状和类型需与输入图像一致。
+                                       为 None 时分配新的数组。
+        strip_rows (int, optional): 每个条带的行数。
+        hsv (numpy.ndarray, optional): 预先转换好的 HSV 图像，提供时跳过颜色转换。
+
+    Returns:
+        numpy.ndarray: 移除特定颜色背景后的图片（即 out）。
+
+    Raises:
+        ValueError: 输出缓冲区的形状或类型与输入图像不一致
+    """
+    if out is None:
+        out = np.empty_like(image)
+    elif out.shape != image.shape or out.dtype != image.dtype:
+        raise ValueError("输出缓冲区与输入图像的形状或类型不一致")
+
+    height, width = image.shape[:2]
+    rows = max(1, min(strip_rows, height))
+
+    # 条带级的临时缓冲区，整幅图像只分配一次
+    hsv_strip = np.empty((rows, width, 3), dtype=np.uint8)
+    mask_strip = np.empty((rows, width), dtype=np.uint8)
+    keep_strip = np.empty((rows, width), dtype=np.uint8)
+
+    for top in range(0, height, rows):
+        bottom = min(top + rows, height)
+        n = bottom - top
+        src = image[top:bottom]
+        if hsv is None:
+            # 将条带从BGR颜色空间转换到HSV颜色空间
+            hsv_src = cv2.cvtColor(src, cv2.COLOR_BGR2HSV, dst=hsv_strip[:n])
+        else:
+            hsv_src = hsv[top:bottom]
+        # 范围内的像素为背景
+        cv2.inRange(hsv_src, lower_bound_color, upper_bound_color, dst=mask_strip[:n])
+        # 直接取反范围检测结果作为保留掩码，不再生成 mask_inv
+        cv2.compare(mask_strip[:n], 0, cv2.CMP_EQ, dst=keep_strip[:n])
+        # 应用掩码并写入输出缓冲区，掩码外的像素为 0
+        dst = out[top:bottom]
+        dst.fill(0)
+        cv2.copyTo(src, keep_strip[:n], dst)
+
+    return out
+
+
+def remove_background(image_path, lower_bound_color, upper_bound_color, out=None):
     """
     移除图片中特定颜色范围的背景。
 
@@ -27,21 +87,18 @@ def remove_background(image_path, lower_bound_color, upper_bound_color):
         image_path (str): 图片的路径。
         lower_bound_color (numpy.ndarray): 要移除的颜色范围的下界（HSV格式）。
         upper_bound_color (numpy.ndarray): 要移除的颜色范围的上界（HSV格式）。
+        out (numpy.ndarray, optional): 可重复使用的输出缓冲区。
 
     Returns:
         numpy.ndarray: 移除特定颜色背景后的图片。
     """
-    # 读取图片
-    image = cv2.imread(image_path)
-    # 将图片从BGR颜色空间转换到HSV颜色空间
-    hsv_img = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-    # 创建一个掩码，仅保留指定颜色范围内的区域
-    mask = cv2.inRange(hsv_img, lower_bound_color, upper_bound_color)
-    # 反转掩码，以便保留非指定颜色的部分
-    mask_inv = cv2.bitwise_not(mask)
-    # 应用掩码，只保留颜色在指定范围内的部分
-    res = cv2.bitwise_and(image, image, mask=mask_inv)
-    return res
+    # 读取图片，启用解码像素存储时直接映射已解码的结果
+    image = read_image(image_path)
+    # 尺寸不匹配的缓冲区无法复用，改为分配新的数组
+    if out is not None and (out.shape != image.shape or out.dtype != image.dtype):
+        out = None
+    return remove_background_fused(image, lower_bound_color, upper_bound_color, out=out,
+                                   hsv=read_image_hsv(image_path))
 
 
 def remove_backgrounds(image_paths, lower_bound_color, upper_bound_color):
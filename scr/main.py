@@ -27,7 +27,7 @@ import json
 import time
 import random
 from image_merging import merge_images_overlap
-from file_utils import save_image, select_image_paths_gui
+from file_utils import save_image, save_image_pyramid, select_image_paths_gui
 from image_processing import remove_backgrounds
 from config import CONFIG
 from HighGUI import adjust_colors_and_preview
@@ -56,6 +56,7 @@ table.add_row("4", "MERGE_METHOD", "图像合并方法 weighted or simple or gri
 table.add_row("5", "LOWER_BOUND_COLOR", "要移除的颜色范围的下界（HSV格式）")
 table.add_row("6", "UPPER_BOUND_COLOR", "要移除的颜色范围的上界（HSV格式）")
 table.add_row("7", "PLACEHOLDER", "图像占位符的文件路径")
+table.add_row("8", "OUTPUT_FORMAT", "输出格式 jpg or dzi（DeepZoom 分块金字塔）")
 
 # 打印表格
 console.print(table)
@@ -135,6 +136,7 @@ def main():
     combined_image = CONFIG.get('COMBINED_IMAGE', 'combined_image')
     lower_bound_color = np.array(CONFIG.get('LOWER_BOUND_COLOR', [0, 0, 0]))
     upper_bound_color = np.array(CONFIG.get('UPPER_BOUND_COLOR', [255, 75, 255]))
+    output_format = CONFIG.get('OUTPUT_FORMAT', 'jpg')
     
     # 获取图片文件
     console.print("Execution:[italic green] Get picture file [/italic green]")
@@ -149,12 +151,17 @@ def main():
     # 合并图片
     console.print("Execution: [italic green] Picture merge [/italic green]")
     display_progress(0.5, 1)
-    merged_image = merge_images_overlap(foregrounds, method=config)
+    # 分块金字塔可以承载大图，网格拼接无需再缩小分辨率
+    grid_output_size = None if output_format == 'dzi' else (1024, 1024)
+    merged_image = merge_images_overlap(foregrounds, method=config, grid_output_size=grid_output_size)
 
     # 保存图片
     console.print("Execution: [italic green] Saving image [/italic green]")
     display_progress(0.1, 1)
-    save_image(merged_image, combined_image)    
+    if output_format == 'dzi':
+        save_image_pyramid(merged_image, combined_image)
+    else:
+        save_image(merged_image, combined_image)
 
     # GUI
     console.print("Execution: [italic green] load GUI [/italic green]")
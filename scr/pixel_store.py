@@ -0,0 +1,230 @@
+# pixel_store.py
+
+"""
+解码像素存储模块
+-----------------------
+
+Author: keeleycenc
+Created on: 2026-10-18
+Last Modified: 2026-10-18
+
+Description:
+    将解码后的图像（以及可选的 HSV 转换结果）以 .npy 格式保存在磁盘上，
+    之后的运行和其它进程通过 np.load(mmap_mode='r') 直接映射使用，无需再次解码 JPEG，
+    同一文件的页缓存由操作系统在进程之间共享。
+
+    文件名中包含源文件的修改时间和大小，源文件变化后旧条目自动失效。
+    每次命中都会刷新条目的修改时间，总大小超过上限时按最久未使用的顺序淘汰。
+    文件先写入临时文件再原子替换，多个进程可以同时使用同一个存储目录。
+
+    在配置文件中设置 PIXEL_STORE 目录后启用，未设置时直接使用 cv2.imread。
+
+Dependencies:
+    - OpenCV
+    - NumPy
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+from config import CONFIG
+
+# 超过该时间（秒）的临时文件视为写入中断留下的残留文件
+STALE_TEMP_SECONDS = 3600
+
+
+class PixelStore:
+    """
+    基于 .npy 文件和内存映射的解码像素存储。
+    """
+
+    def __init__(self, folder_path, max_bytes):
+        """
+        Args:
+            folder_path (str): 存储目录。
+            max_bytes (int): 存储目录的总大小上限（字节）。
+        """
+        self.folder_path = folder_path
+        self.max_bytes = max_bytes
+        os.makedirs(folder_path, exist_ok=True)
+
+    def _entry_prefix(self, image_path):
+        """
+        Returns:
+            str: 源文件对应的条目文件名前缀。
+        """
+        source = os.path.normcase(os.path.abspath(image_path))
+        return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, image_path, kind):
+        """
+        Returns:
+            str: 与源文件当前修改时间和大小对应的条目路径。
+        """
+        stat = os.stat(image_path)
+        name = f"{self._entry_prefix(image_path)}_{stat.st_mtime_ns}_{stat.st_size}_{kind}.npy"
+        return os.path.join(self.folder_path, name)
+
+    def load(self, image_path, kind='bgr'):
+        """
+        获取图像的解码结果。命中时返回只读的内存映射数组，未命中时解码并写入存储。
+
+        Args:
+            image_path (str): 图像路径。
+            kind (str, optional): "bgr" 为解码后的图像，"hsv" 为转换到 HSV 颜色空间后的图像。
+
+        Returns:
+            numpy.ndarray: 只读的图像数组，无法加载源文件时为 None。
+
+        Raises:
+            ValueError: 未知的条目类型
+        """
+        if kind not in ('bgr', 'hsv'):
+            raise ValueError("Unknown pixel store kind: {}".format(kind))
+
+        try:
+            entry_path = self._entry_path(image_path, kind)
+        except OSError:
+            return None
+
+        try:
+            image = np.load(entry_path, mmap_mode='r')
+        except (OSError, ValueError):
+            image = None
+
+        if image is not None:
+            # 刷新修改时间，用于最久未使用淘汰。只读或其他用户的存储无法刷新，仍然使用命中的条目
+            try:
+                os.utime(entry_path)
+            except OSError:
+                pass
+            return np.asarray(image)
+
+        if kind == 'hsv':
+            bgr = self.load(image_path, 'bgr')
+            if bgr is None:
+                return None
+            image = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+        else:
+            image = cv2.imread(image_path)
+            if image is None:
+                return None
+
+        self._write(image_path, entry_path, image)
+        return image
+
+    def _write(self, image_path, entry_path, image):
+        """
+        原子写入条目，删除同一源文件的过期条目，并在超过大小上限时淘汰旧条目。
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.folder_path, suffix='.tmp')
+        try:
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    np.save(file, image)
+                os.replace(temp_path, entry_path)
+            finally:
+                # 写入失败时清理临时文件，替换成功后临时文件已不存在
+                if os.path.exists(temp_path):
+                    self._remove(temp_path)
+        except OSError:
+            return
+
+        # 源文件修改后留下的旧条目不会再命中
+        prefix = self._entry_prefix(image_path)
+        kind_suffix = entry_path[entry_path.rindex('_'):]
+        current = os.path.basename(entry_path)
+        for name in os.listdir(self.folder_path):
+            if name.startswith(prefix) and name.endswith(kind_suffix) and name != current:
+                self._remove(os.path.join(self.folder_path, name))
+
+        self.evict(keep=entry_path)
+
+    def evict(self, keep=None):
+        """
+        总大小超过上限时，按修改时间从旧到新删除条目。
+        同时删除进程被终止等原因留下的过期临时文件。
+
+        Args:
+            keep (str, optional): 不删除的条目路径。
+        """
+        entries = []
+        total = 0
+        now = time.time()
+        for name in os.listdir(self.folder_path):
+            if not name.endswith(('.npy', '.tmp')):
+                continue
+            path = os.path.join(self.folder_path, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if name.endswith('.tmp'):
+                # 其它进程可能正在写入较新的临时文件
+                if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                    self._remove(path)
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            if self._remove(path):
+                total -= size
+
+    @staticmethod
+    def _remove(path):
+        """
+        删除条目。其它进程可能已经删除或仍在映射它，删除失败时忽略。
+
+        Returns:
+            bool: 是否删除成功。
+        """
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+# 按配置创建的存储实例，未启用时为 None
+_default_store = None
+if CONFIG.get('PIXEL_STORE'):
+    _default_store = PixelStore(CONFIG['PIXEL_STORE'], CONFIG.get('PIXEL_STORE_MAX_MB', 1024) * 1024 * 1024)
+
+
+def read_image(image_path):
+    """
+    读取图像。启用解码像素存储时返回只读的内存映射数组，否则等同于 cv2.imread。
+
+    Args:
+        image_path (str): 图像路径。
+
+    Returns:
+        numpy.ndarray: 解码后的图像，无法加载时为 None。
+    """
+    if _default_store is None:
+        return cv2.imread(image_path)
+    return _default_store.load(image_path, 'bgr')
+
+
+def read_image_hsv(image_path):
+    """
+    读取图像转换到 HSV 颜色空间后的结果。仅在启用解码像素存储且
+    PIXEL_STORE_HSV 为 true 时使用存储，否则返回 None，由调用方自行转换。
+
+    Args:
+        image_path (str): 图像路径。
+
+    Returns:
+        numpy.ndarray: HSV 格式的图像，或 None。
+    """
+    if _default_store is None or not CONFIG.get('PIXEL_STORE_HSV', False):
+        return None
+    return _default_store.load(image_path, 'hsv')
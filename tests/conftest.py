@@ -0,0 +1,13 @@
+# conftest.py
+
+"""
+测试配置：模块位于 scr 目录下，且 config.py 在导入时读取当前目录中的 config.json，
+因此测试前将 scr 加入模块搜索路径并切换到项目根目录。
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scr'))
+os.chdir(ROOT)
@@ -0,0 +1,164 @@
+# test_batch_runner.py
+
+"""
+批量任务的排序、断点续跑和缓存测试。
+"""
+
+import json
+import numpy as np
+import pytest
+import batch_runner
+from batch_runner import ImageCache, load_completed_ids, load_manifest, schedule_jobs
+
+BOUNDS = ((0, 0, 0), (180, 75, 255))
+OTHER_BOUNDS = ((0, 0, 0), (90, 255, 255))
+
+
+def make_job(job_id, images, bounds=BOUNDS):
+    return {'id': job_id, 'images': images, 'lower_bound': bounds[0], 'upper_bound': bounds[1]}
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """
+    记录解码次数，用随机图像代替读取文件。
+    """
+    calls = []
+
+    def fake_read_image(path):
+        calls.append(path)
+        if path == 'missing':
+            return None
+        rng = np.random.default_rng(len(path))
+        return rng.integers(0, 256, (8, 8, 3), dtype=np.uint8)
+
+    monkeypatch.setattr(batch_runner, 'read_image', fake_read_image)
+    monkeypatch.setattr(batch_runner, 'read_image_hsv', lambda path: None)
+    return calls
+
+
+def run_jobs(jobs, capacity):
+    cache = ImageCache(jobs, capacity)
+    for step, job in enumerate(jobs):
+        for path in job['images']:
+            cache.get_foreground(path, job['lower_bound'], job['upper_bound'], step)
+        cache.release(step)
+    return cache
+
+
+def test_schedule_groups_shared_images():
+    jobs = [
+        make_job('1', ['A', 'B']),
+        make_job('2', ['C', 'D']),
+        make_job('3', ['A', 'B', 'E']),
+        make_job('4', ['D', 'F']),
+    ]
+    assert [job['id'] for job in schedule_jobs(jobs)] == ['1', '3', '2', '4']
+
+
+def test_schedule_keeps_manifest_order_on_ties():
+    jobs = [make_job(str(i), [str(i)]) for i in range(5)]
+    assert [job['id'] for job in schedule_jobs(jobs)] == ['0', '1', '2', '3', '4']
+
+
+def test_load_completed_ids(tmp_path):
+    results = tmp_path / 'results.jsonl'
+    results.write_text(
+        json.dumps({'id': 'a', 'status': 'ok'}) + '\n'
+        + json.dumps({'id': 'b', 'status': 'error', 'error': 'boom'}) + '\n'
+        + json.dumps({'id': 'c', 'status': 'ok'}) + '\n'
+        + '{"id": "d", "sta'  # 中断时留下的不完整行
+    )
+    assert load_completed_ids(str(results)) == {'a', 'c'}
+
+
+def test_load_completed_ids_missing_file(tmp_path):
+    assert load_completed_ids(str(tmp_path / 'missing.jsonl')) == set()
+
+
+def write_manifest(tmp_path, *entries):
+    manifest = tmp_path / 'jobs.jsonl'
+    manifest.write_text('\n'.join(json.dumps(entry) for entry in entries) + '\n')
+    return str(manifest)
+
+
+def test_load_manifest_fills_defaults(tmp_path):
+    jobs = load_manifest(write_manifest(tmp_path, {'id': 'a', 'images': ['x.jpg'], 'lower_bound': [1, 2, 3]}))
+    assert len(jobs) == 1
+    assert jobs[0]['images'] == [batch_runner.normalize_path('x.jpg')]
+    assert jobs[0]['lower_bound'] == (1, 2, 3)
+    assert len(jobs[0]['upper_bound']) == 3
+
+
+@pytest.mark.parametrize('entry', [
+    {'images': 'images/a.jpg'},
+    {'images': ['a.jpg', 3]},
+    {'images': ['a.jpg'], 'lower_bound': 5},
+    {'images': ['a.jpg'], 'upper_bound': [0, 255]},
+    {'images': ['a.jpg'], 'upper_bound': [0, 255, 1.5]},
+    ['a.jpg'],
+])
+def test_load_manifest_rejects_invalid_entries(tmp_path, entry):
+    manifest = write_manifest(tmp_path, {'images': ['ok.jpg']}, entry)
+    with pytest.raises(ValueError, match="第 2 行"):
+        load_manifest(manifest)
+
+
+def test_failed_decode_does_not_evict(decodes):
+    jobs = [make_job('1', ['A', 'B']), make_job('2', ['missing']), make_job('3', ['A', 'B']),
+            make_job('4', ['missing'])]
+    cache = ImageCache(jobs, capacity=2)
+    for path in jobs[0]['images']:
+        cache.get_foreground(path, BOUNDS[0], BOUNDS[1], 0)
+    cache.release(0)
+    with pytest.raises(ValueError):
+        cache.get_foreground('missing', BOUNDS[0], BOUNDS[1], 1)
+    assert sorted(cache._entries) == ['A', 'B']
+
+
+def test_image_without_later_use_does_not_evict(decodes):
+    jobs = [make_job('1', ['A', 'B']), make_job('2', ['C', 'A', 'B']), make_job('3', ['A', 'B'])]
+    run_jobs(jobs, capacity=2)
+    assert decodes == ['A', 'B', 'C']
+
+
+def test_current_job_images_are_not_evicted(decodes):
+    jobs = [make_job('1', ['A', 'B', 'C']), make_job('2', ['A', 'B', 'C'])]
+    cache = ImageCache(jobs, capacity=2)
+    for path in jobs[0]['images']:
+        cache.get_foreground(path, BOUNDS[0], BOUNDS[1], 0)
+    # 当前任务内暂时超出上限，任务结束后恢复
+    assert decodes == ['A', 'B', 'C']
+    cache.release(0)
+    assert len(cache._entries) == 2
+
+
+def test_evicts_furthest_next_use(decodes):
+    jobs = [
+        make_job('1', ['A', 'B']),
+        make_job('2', ['C']),
+        make_job('3', ['A']),
+        make_job('4', ['C']),
+        make_job('5', ['B']),
+    ]
+    run_jobs(jobs, capacity=2)
+    # 加载 C 时淘汰下一次使用最远的 B
+    assert decodes == ['A', 'B', 'C', 'B']
+
+
+def test_release_drops_unused_foregrounds(decodes):
+    jobs = [
+        make_job('1', ['A'], BOUNDS),
+        make_job('2', ['A'], OTHER_BOUNDS),
+        make_job('3', ['A'], BOUNDS),
+        make_job('4', ['A'], BOUNDS),
+    ]
+    cache = ImageCache(jobs, capacity=2)
+    for step, job in enumerate(jobs):
+        cache.get_foreground('A', job['lower_bound'], job['upper_bound'], step)
+        cache.release(step)
+        if step == 1:
+            # OTHER_BOUNDS 之后不再使用，BOUNDS 的结果保留到第 3、4 个任务
+            assert list(cache._entries['A']['foregrounds']) == [BOUNDS]
+    assert 'A' not in cache._entries
+    assert decodes == ['A']
@@ -0,0 +1,44 @@
+# test_file_utils.py
+
+"""
+DeepZoom 分块金字塔输出的测试。
+"""
+
+import os
+import cv2
+import numpy as np
+import pytest
+import file_utils
+from file_utils import save_image_pyramid
+
+
+def random_image(height, width):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def test_levels_and_tiles(tmp_path):
+    dzi_path = save_image_pyramid(random_image(300, 600), str(tmp_path), name='pyramid', tile_format='png')
+    assert os.path.isfile(dzi_path)
+
+    tiles_path = tmp_path / 'pyramid_files'
+    # 600 像素需要 ceil(log2(600)) + 1 = 11 个级别
+    assert sorted(int(level) for level in os.listdir(tiles_path)) == list(range(11))
+    assert sorted(os.listdir(tiles_path / '10')) == ['0_0.png', '0_1.png', '1_0.png', '1_1.png', '2_0.png', '2_1.png']
+    assert cv2.imread(str(tiles_path / '10' / '2_1.png')).shape == (44, 88, 3)
+    assert cv2.imread(str(tiles_path / '0' / '0_0.png')).shape == (1, 1, 3)
+
+
+def test_rewrite_clears_old_tiles(tmp_path):
+    save_image_pyramid(random_image(600, 600), str(tmp_path), name='pyramid')
+    save_image_pyramid(random_image(100, 100), str(tmp_path), name='pyramid')
+
+    tiles_path = tmp_path / 'pyramid_files'
+    assert sorted(int(level) for level in os.listdir(tiles_path)) == list(range(8))
+    assert os.listdir(tiles_path / '7') == ['0_0.jpg']
+
+
+def test_failed_tile_write_raises(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_utils.cv2, 'imwrite', lambda path, image: False)
+    with pytest.raises(ValueError):
+        save_image_pyramid(random_image(10, 10), str(tmp_path), name='pyramid')
@@ -0,0 +1,100 @@
+# test_highgui.py
+
+"""
+预览主循环帧率上限的测试。用假时钟和假 cv2 窗口函数模拟拖动轨迹条。
+"""
+
+import types
+import numpy as np
+import pytest
+import HighGUI
+
+FRAME_MS = 33
+DRAG_START_MS = 600
+DRAG_END_MS = 1600
+EVENT_INTERVAL_MS = 5
+CLOSE_MS = 2500
+
+
+class FakeGui:
+    """
+    假时钟和窗口：waitKey 推进时钟，并在等待期间按时间调用轨迹条回调。
+    """
+
+    def __init__(self):
+        self.now_ms = 0.0
+        self.callbacks = []
+        self.position = 0
+        self.next_event_ms = DRAG_START_MS
+        self.renders = []
+        self.waits = []
+
+    def perf_counter(self):
+        return self.now_ms / 1000
+
+    def wait_key(self, wait_ms):
+        self.waits.append(wait_ms)
+        end_ms = self.now_ms + wait_ms
+        while self.next_event_ms <= min(end_ms, DRAG_END_MS):
+            self.now_ms = self.next_event_ms
+            self.position = (self.position + 1) % 256
+            self.callbacks[0](self.position)
+            self.next_event_ms += EVENT_INTERVAL_MS
+        self.now_ms = end_ms
+        return -1
+
+    def imshow(self, name, image):
+        self.renders.append((self.now_ms, self.position))
+
+
+@pytest.fixture
+def gui(monkeypatch):
+    fake = FakeGui()
+    cv2_stub = types.SimpleNamespace(
+        namedWindow=lambda name: None,
+        createTrackbar=lambda name, window, value, count, callback: fake.callbacks.append(callback),
+        getTrackbarPos=lambda name, window: fake.position,
+        imshow=fake.imshow,
+        setWindowTitle=lambda name, title: None,
+        waitKey=fake.wait_key,
+        getWindowProperty=lambda name, prop: 1 if fake.now_ms < CLOSE_MS else 0,
+        WND_PROP_VISIBLE=HighGUI.cv2.WND_PROP_VISIBLE,
+    )
+    monkeypatch.setattr(HighGUI, 'cv2', cv2_stub)
+    monkeypatch.setattr(HighGUI, 'time', types.SimpleNamespace(perf_counter=fake.perf_counter))
+    monkeypatch.setattr(HighGUI, 'remove_background',
+                        lambda path, lower, upper, out=None: np.zeros((4, 4, 3), dtype=np.uint8))
+    monkeypatch.setattr(HighGUI, 'CONFIG', {'PREVIEW_FPS': 30, 'PREVIEW_IDLE_WAIT_MS': 200,
+                                            'MERGE_METHOD': 'weighted'})
+    for name, value in [('trackbars_created', False), ('preview_state', None), ('preview_buffers', {}),
+                        ('threshold_dirty', False), ('display_dirty', False), ('dirty_since', None),
+                        ('last_render_time', 0.0)]:
+        monkeypatch.setattr(HighGUI, name, value)
+    return fake
+
+
+def test_drag_from_idle_respects_frame_cap(gui):
+    HighGUI.adjust_colors_and_preview(['a.jpg'])
+
+    drag_renders = [t for t, _ in gui.renders if DRAG_START_MS <= t <= DRAG_END_MS + FRAME_MS]
+    assert len(drag_renders) <= (DRAG_END_MS - DRAG_START_MS) // FRAME_MS + 2
+    assert len(drag_renders) >= (DRAG_END_MS - DRAG_START_MS) // FRAME_MS - 5
+    # 相邻两帧的间隔不小于帧间隔
+    assert all(b - a >= FRAME_MS for a, b in zip(drag_renders, drag_renders[1:]))
+    # 拖动结束后最终位置会在一帧内显示
+    last_time, last_position = gui.renders[-1]
+    assert last_position == gui.position
+    assert last_time <= DRAG_END_MS + 2 * FRAME_MS
+
+
+def test_idle_backoff_reaches_max_wait(gui):
+    HighGUI.adjust_colors_and_preview(['a.jpg'])
+    # 拖动开始前的空闲等待逐步加倍到上限
+    assert max(gui.waits[:10]) == 200
+
+
+@pytest.mark.parametrize('value', [0, -5, 'fast', True, None])
+def test_invalid_config_falls_back_to_default(monkeypatch, value):
+    monkeypatch.setattr(HighGUI, 'CONFIG', {'PREVIEW_FPS': value, 'PREVIEW_IDLE_WAIT_MS': value})
+    assert HighGUI.get_frame_interval_ms() == 33
+    assert HighGUI.get_positive_config('PREVIEW_IDLE_WAIT_MS', 200) == 200
@@ -0,0 +1,94 @@
+# test_image_merging.py
+
+"""
+增量合并状态与一次性合并结果一致性的测试。
+"""
+
+import numpy as np
+import pytest
+from image_merging import MergeState, merge_images_simple, merge_images_weighted
+
+MERGES = {
+    'weighted': merge_images_weighted,
+    'simple': merge_images_simple,
+}
+
+
+def random_images(count, shape=(40, 50, 3), seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, shape, dtype=np.uint8) for _ in range(count)]
+
+
+def test_weighted_is_rounded_mean():
+    images = random_images(4)
+    expected = np.floor(np.mean(np.stack(images).astype(np.float64), axis=0) + 0.5).astype(np.uint8)
+    np.testing.assert_array_equal(merge_images_weighted(images), expected)
+
+
+@pytest.mark.parametrize('method', MERGES)
+def test_insert_matches_full_merge(method):
+    images = random_images(4)
+    state = MergeState(method)
+    for i, image in enumerate(images):
+        state.insert(i, image)
+        np.testing.assert_array_equal(state.result(), MERGES[method](images[:i + 1]))
+
+
+@pytest.mark.parametrize('method', MERGES)
+def test_remove_matches_full_merge(method):
+    images = random_images(4, seed=1)
+    state = MergeState(method)
+    for i, image in enumerate(images):
+        state.insert(i, image)
+
+    state.remove(1)
+    np.testing.assert_array_equal(state.result(), MERGES[method]([images[0], images[2], images[3]]))
+    state.remove(3)
+    np.testing.assert_array_equal(state.result(), MERGES[method]([images[0], images[2]]))
+    assert state.keys() == [0, 2]
+
+
+@pytest.mark.parametrize('method', MERGES)
+def test_replace_matches_full_merge(method):
+    images = random_images(3, seed=2)
+    replacement = random_images(1, seed=3)[0]
+    state = MergeState(method)
+    for i, image in enumerate(images):
+        state.insert(i, image)
+
+    state.replace(1, replacement)
+    np.testing.assert_array_equal(state.result(), MERGES[method]([images[0], replacement, images[2]]))
+
+
+@pytest.mark.parametrize('method', MERGES)
+def test_size_change_rebuilds(method):
+    images = random_images(3, seed=4)
+    small = random_images(1, shape=(30, 35, 3), seed=5)[0]
+    state = MergeState(method)
+    for i, image in enumerate(images):
+        state.insert(i, image)
+
+    # 插入更小的图像后所有图像缩小到新的最小尺寸
+    state.insert(3, small)
+    np.testing.assert_array_equal(state.result(), MERGES[method](images + [small]))
+
+    # 移除最小的图像后恢复到原始尺寸
+    state.remove(3)
+    result = state.result()
+    assert result.shape == images[0].shape
+    np.testing.assert_array_equal(result, MERGES[method](images))
+
+
+def test_empty_state_raises():
+    state = MergeState('weighted')
+    with pytest.raises(ValueError):
+        state.result()
+    state.insert(0, random_images(1)[0])
+    state.remove(0)
+    with pytest.raises(ValueError):
+        state.result()
+
+
+def test_unknown_method_raises():
+    with pytest.raises(ValueError):
+        MergeState('average')
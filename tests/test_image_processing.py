@@ -0,0 +1,78 @@
+# test_image_processing.py
+
+"""
+融合背景移除与逐步处理结果一致性的测试。
+"""
+
+import cv2
+import numpy as np
+import pytest
+from image_processing import remove_background_fused
+
+BOUNDS = [
+    ([0, 0, 0], [255, 255, 255]),
+    ([0, 0, 0], [180, 75, 255]),
+    ([30, 40, 50], [90, 200, 220]),
+    ([100, 0, 0], [179, 255, 128]),
+    ([255, 0, 0], [0, 255, 255]),  # 上下界颠倒，不移除任何像素
+]
+
+
+def reference(image, lower, upper):
+    """
+    原始的逐步背景移除：cvtColor -> inRange -> bitwise_not -> bitwise_and。
+    """
+    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    mask = cv2.inRange(hsv, lower, upper)
+    return cv2.bitwise_and(image, image, mask=cv2.bitwise_not(mask))
+
+
+def random_image(height, width, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize('height', [1, 63, 64, 65, 130, 200])
+@pytest.mark.parametrize('lower, upper', BOUNDS)
+def test_matches_reference(height, lower, upper):
+    image = random_image(height, 37, seed=height)
+    lower, upper = np.array(lower), np.array(upper)
+    np.testing.assert_array_equal(remove_background_fused(image, lower, upper), reference(image, lower, upper))
+
+
+@pytest.mark.parametrize('strip_rows', [1, 7, 64, 1000])
+def test_strip_rows_do_not_change_result(strip_rows):
+    image = random_image(150, 90)
+    lower, upper = np.array([20, 30, 40]), np.array([160, 220, 230])
+    result = remove_background_fused(image, lower, upper, strip_rows=strip_rows)
+    np.testing.assert_array_equal(result, reference(image, lower, upper))
+
+
+def test_reuses_out_buffer():
+    out = np.full((129, 50, 3), 7, dtype=np.uint8)
+    for seed, (lower, upper) in enumerate(BOUNDS):
+        image = random_image(129, 50, seed=seed)
+        lower, upper = np.array(lower), np.array(upper)
+        result = remove_background_fused(image, lower, upper, out=out)
+        assert result is out
+        np.testing.assert_array_equal(out, reference(image, lower, upper))
+
+
+def test_wrong_out_shape_raises():
+    image = random_image(64, 64)
+    with pytest.raises(ValueError):
+        remove_background_fused(image, np.array([0, 0, 0]), np.array([255, 255, 255]),
+                                out=np.empty((64, 63, 3), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        remove_background_fused(image, np.array([0, 0, 0]), np.array([255, 255, 255]),
+                                out=np.empty((64, 64, 3), dtype=np.uint16))
+
+
+@pytest.mark.parametrize('lower, upper', BOUNDS)
+def test_precomputed_hsv(lower, upper):
+    image = random_image(131, 45, seed=3)
+    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    hsv.setflags(write=False)
+    lower, upper = np.array(lower), np.array(upper)
+    result = remove_background_fused(image, lower, upper, hsv=hsv)
+    np.testing.assert_array_equal(result, reference(image, lower, upper))
@@ -0,0 +1,156 @@
+# test_pixel_store.py
+
+"""
+解码像素存储的失效、淘汰和临时文件清理测试。
+"""
+
+import os
+import time
+import cv2
+import numpy as np
+import pytest
+import pixel_store
+from pixel_store import PixelStore, STALE_TEMP_SECONDS
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """
+    记录 cv2.imread 的调用次数。
+    """
+    calls = []
+    imread = cv2.imread
+
+    def counting_imread(path, *args):
+        calls.append(os.path.basename(path))
+        return imread(path, *args)
+
+    monkeypatch.setattr(pixel_store.cv2, 'imread', counting_imread)
+    return calls
+
+
+def write_source(folder, name, seed=0):
+    rng = np.random.default_rng(seed)
+    path = os.path.join(folder, name)
+    cv2.imwrite(path, rng.integers(0, 256, (20, 20, 3), dtype=np.uint8))
+    return path
+
+
+def entry_files(store_path):
+    return sorted(name for name in os.listdir(store_path) if name.endswith('.npy'))
+
+
+def test_hit_returns_readonly_mapping(tmp_path, decodes):
+    source = write_source(tmp_path, 'a.png')
+    store = PixelStore(str(tmp_path / 'store'), 1 << 20)
+
+    first = store.load(source)
+    second = store.load(source)
+    assert decodes == ['a.png']
+    assert not second.flags.writeable
+    np.testing.assert_array_equal(second, first)
+
+
+def test_hit_survives_failed_lru_refresh(tmp_path, decodes, monkeypatch):
+    source = write_source(tmp_path, 'a.png')
+    store = PixelStore(str(tmp_path / 'store'), 1 << 20)
+    store.load(source)
+
+    def failing_utime(path, *args, **kwargs):
+        raise PermissionError(path)
+
+    monkeypatch.setattr(pixel_store.os, 'utime', failing_utime)
+    assert store.load(source) is not None
+    assert decodes == ['a.png']
+
+
+def test_source_change_invalidates_entry(tmp_path, decodes):
+    source = write_source(tmp_path, 'a.png')
+    store_path = tmp_path / 'store'
+    store = PixelStore(str(store_path), 1 << 20)
+    store.load(source)
+
+    # 修改时间变化
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    store.load(source)
+    assert decodes == ['a.png', 'a.png']
+    assert len(entry_files(store_path)) == 1
+
+    # 内容和大小变化
+    write_source(tmp_path, 'a.png', seed=1)
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+    np.testing.assert_array_equal(store.load(source), cv2.imread(source))
+    assert len(entry_files(store_path)) == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    sources = [write_source(tmp_path, f"{name}.png", seed=i) for i, name in enumerate('abc')]
+    store_path = tmp_path / 'store'
+    store = PixelStore(str(store_path), 1 << 20)
+    store.load(sources[0])
+    store.load(sources[1])
+
+    entry_a = store._entry_path(sources[0], 'bgr')
+    entry_b = store._entry_path(sources[1], 'bgr')
+    os.utime(entry_a, ns=(1_000_000_000, 1_000_000_000))
+    os.utime(entry_b, ns=(2_000_000_000, 2_000_000_000))
+
+    # 命中 a 后 b 成为最久未使用的条目
+    store.load(sources[0])
+    store.max_bytes = os.path.getsize(entry_a) * 2
+    store.load(sources[2])
+
+    assert os.path.exists(entry_a)
+    assert not os.path.exists(entry_b)
+    assert os.path.exists(store._entry_path(sources[2], 'bgr'))
+
+
+def test_size_cap_keeps_newest_entry(tmp_path):
+    sources = [write_source(tmp_path, f"{i}.png", seed=i) for i in range(3)]
+    store_path = tmp_path / 'store'
+    store = PixelStore(str(store_path), 1)
+    for source in sources:
+        store.load(source)
+
+    assert entry_files(store_path) == [os.path.basename(store._entry_path(sources[-1], 'bgr'))]
+
+
+def test_hsv_entry(tmp_path):
+    source = write_source(tmp_path, 'a.png')
+    store = PixelStore(str(tmp_path / 'store'), 1 << 20)
+    expected = cv2.cvtColor(cv2.imread(source), cv2.COLOR_BGR2HSV)
+    np.testing.assert_array_equal(store.load(source, 'hsv'), expected)
+    np.testing.assert_array_equal(store.load(source, 'hsv'), expected)
+    with pytest.raises(ValueError):
+        store.load(source, 'lab')
+
+
+def test_failed_write_removes_temp_file(tmp_path, monkeypatch):
+    source = write_source(tmp_path, 'a.png')
+    store_path = tmp_path / 'store'
+    store = PixelStore(str(store_path), 1 << 20)
+
+    def failing_save(file, image):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(pixel_store.np, 'save', failing_save)
+    with pytest.raises(RuntimeError):
+        store.load(source)
+    assert os.listdir(store_path) == []
+
+
+def test_evict_removes_stale_temp_files(tmp_path):
+    store_path = tmp_path / 'store'
+    store = PixelStore(str(store_path), 1 << 20)
+    stale = store_path / 'stale.tmp'
+    fresh = store_path / 'fresh.tmp'
+    stale.write_bytes(b'x')
+    fresh.write_bytes(b'x')
+    old = time.time() - STALE_TEMP_SECONDS - 10
+    os.utime(stale, (old, old))
+
+    store.evict()
+    assert not stale.exists()
+    assert fresh.exists()